@@ -9,8 +9,16 @@
 # Main Features:
 # - extract_key_candidates_from_lines: Extract and normalize [xxx] keys from
 #   lyrics lines.
+# - extract_key_candidates_from_text: Same, scanning a whole lyrics text with
+#   one multiline regex.
+# - extract_key_candidates_from_file: Same, scanning a memory-mapped lyrics
+#   file and decoding only the matched keys.
 # - normalize_key_string: Consistent normalization of key strings for
 #   comparison and classification.
+# - build_alias_index: Invert an alias map into a normalized alias ->
+#   canonical lookup, built once and reused for O(1) alias resolution.
+# - alias_phrase_length: Longest alias in an alias index, in words; caps the
+#   key sub-phrases probed against it.
 # - match_key_to_canonical: Map aliases to canonical performer names using a
 #   provided alias map.
 # - classify_key: Classify keys as 'performer', 'ignore', or 'skip' using alias
@@ -18,6 +26,12 @@
 # - IGNORE_SET: Comprehensive set of non-performer/structural labels to filter
 #   out.
 # - load_lyrics_file: Utility for reading lyrics files with error handling.
+# - iter_lyrics_lines: Stream a lyrics file line by line without loading it
+#   fully into memory.
+# - write_performer_files_streaming: Attribute lyrics and write per-performer
+#   text files in a single pass, without buffering every performer's lines.
+# - iter_jsonl_pairs: Lazily yield ChatML/ShareGPT training objects for a
+#   performer's lines.
 #
 # This module is designed for use in data cleaning, preprocessing, and test-
 #   driven workflows for lyric-based machine learning and analysis projects.
@@ -25,35 +39,54 @@
 
 __all__ = [
     'extract_key_candidates_from_lines',
+    'extract_key_candidates_from_text',
+    'extract_key_candidates_from_file',
     'normalize_key_string',
+    'build_alias_index',
+    'alias_phrase_length',
     'match_key_to_canonical',
     'classify_key',
     'find_canonical_performers',
     'split_lyrics_by_performer',
     'write_performer_files',
+    'write_performer_files_streaming',
     'write_performer_jsonl',
     'split_lines_to_jsonl_pairs',
+    'iter_jsonl_pairs',
     'load_lyrics_file',
+    'iter_lyrics_lines',
     'IGNORE_SET',
 ]
 
 # 1. Imports
 import re
 import os
-from typing import List, Dict, Set, Optional
+import mmap
+from functools import lru_cache
+from itertools import groupby
+from typing import (
+    AbstractSet, Callable, DefaultDict, Dict, FrozenSet, Iterable, Iterator,
+    List, Optional, Sequence, Set, TextIO, Tuple
+)
 import json
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 
 # 2. Constants
 
 # Characters treated as separators and trimmed during key normalization
-DEFAULT_TRIM_CHARS: List[str] = [':']
+DEFAULT_TRIM_CHARS: Tuple[str, ...] = (':',)
 
 # Characters replaced with spaces during key normalization
-DEFAULT_REPLACE_WITH_SPACE_CHARS: List[str] = [
+DEFAULT_REPLACE_WITH_SPACE_CHARS: Tuple[str, ...] = (
     '&', '/', '+', '-', '(', ')', ','
-]
+)
 
-IGNORE_SET: Set[str] = set([
+# Structural (non-performer) labels, stored already normalized so they can be
+#   compared directly with normalize_key_string output; frozen because it is
+#   shared as a default argument
+IGNORE_SET: FrozenSet[str] = frozenset({
     "skit", "interlude", "chorus", "bridge", "intro", "outro", "instrumental",
     "crowd", "audience", "refrain", "dj", "mc", "beat", "music", "sound",
     "applause", "laughing", "noise", "verse", "break", "hook", "only",
@@ -71,12 +104,55 @@ IGNORE_SET: Set[str] = set([
     "gunshot", "rocket fired whistles off and explodes breaking glass",
     "skip next line on the second time of chorus", "sounds of fighting",
     "sound of a plane crashing and explosion", "sounds of combat"
-])
+})
+
+# Compiled patterns shared by the line-scanning helpers below
+_KEY_PATTERN = re.compile(r'^\[([^\]]+)\]$')
+# Whole-text variant: one [key] per line, surrounded only by whitespace
+_KEY_LINE_PATTERN = re.compile(r'^[^\S\n]*\[([^\]\n]+)\][^\S\n]*$', re.M)
+# Non-ASCII characters that [^\S\n] matches in str patterns (NBSP, em space,
+#   ideographic space, ...), for the bytes variant below
+_NON_ASCII_LINE_SPACE = (
+    '\x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007'
+    '\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000'
+)
+# One whitespace character other than '\n', ASCII or UTF-8 encoded
+_LINE_SPACE_BYTES = b'(?:[\t\x0b\x0c\r\x1c-\x1f ]|%s)' % b'|'.join(
+    re.escape(c.encode('utf-8')) for c in _NON_ASCII_LINE_SPACE
+)
+# Bytes variant for memory-mapped UTF-8 files, with the same padding rules
+_KEY_LINE_BYTES_PATTERN = re.compile(
+    rb'^%s*\[([^\]\n]+)\]%s*$' % (_LINE_SPACE_BYTES, _LINE_SPACE_BYTES),
+    re.M
+)
+_WS_PATTERN = re.compile(r'\s+')
+# Matches only where _WS_PATTERN.sub(' ', ...) would change the string
+_WS_RUN_PATTERN = re.compile(r'\s\s|[^\S ]')
+
+# Reused JSON encoder; json.dumps(obj, ensure_ascii=False) would build a
+#   new JSONEncoder for every object
+_encode_json = json.JSONEncoder(ensure_ascii=False).encode
+
+# Buffer size for writers that emit many small writes per file, so each
+#   file is flushed in a few large syscalls instead of 8 KiB chunks
+_WRITE_BUFFER_SIZE = 1 << 18
+
+# Characters replaced with '_' in output file names
+_SAFE_NAME_PATTERN = re.compile(r'[^\w ]')
+
+# Translate table mapping every default separator character to a space
+_DEFAULT_SEPARATORS = DEFAULT_REPLACE_WITH_SPACE_CHARS + DEFAULT_TRIM_CHARS
+_TRANS_TABLE = str.maketrans(dict.fromkeys(_DEFAULT_SEPARATORS, ' '))
+# Matches any key that the default normalization would change beyond
+#   stripping and lowercasing (a separator or whitespace to collapse)
+_DEFAULT_NORMALIZE_PATTERN = re.compile(
+    '[' + re.escape(''.join(_DEFAULT_SEPARATORS)) + r']|\s\s|[^\S ]'
+)
 
 
 # 3. Core Utility Functions
 def extract_key_candidates_from_lines(
-    lines: List[str],
+    lines: Iterable[str],
     trim_chars: Optional[List[str]] = None,
     replace_with_space_chars: Optional[List[str]] = None
 ) -> List[str]:
@@ -84,7 +160,8 @@ def extract_key_candidates_from_lines(
     Extract and clean all [xxx] key patterns from a list of lines.
 
     Args:
-        lines (list of str): Lines of lyrics to scan for [xxx] keys.
+        lines (iterable of str): Lines of lyrics to scan for [xxx] keys, e.g.
+            a list or the generator returned by iter_lyrics_lines.
         trim_chars (list of str, optional): Characters to treat as separators
             (replace with space, e.g., ':').
         replace_with_space_chars (list of str, optional): Characters to replace
@@ -99,20 +176,110 @@ def extract_key_candidates_from_lines(
     if replace_with_space_chars is None:
         # Use a subset for extraction (no comma)
         replace_with_space_chars = DEFAULT_REPLACE_WITH_SPACE_CHARS[:-1]
-    key_pattern = re.compile(r'^\[([^\]]+)\]$')
-    keys = []
+    raw_keys = []
     for line in lines:
-        match = key_pattern.match(line.strip())
+        # Only lines containing '[' can be keys; skip strip + regex otherwise
+        match = '[' in line and _KEY_PATTERN.match(line.strip())
         if match:
-            key = match.group(1)
-            # Use normalize_key_string for normalization
-            key = normalize_key_string(
-                key,
-                trim_chars=trim_chars,
-                replace_with_space_chars=replace_with_space_chars
-            )
-            keys.append(key)
-    return keys
+            raw_keys.append(match.group(1))
+    return _normalize_keys(raw_keys, trim_chars, replace_with_space_chars)
+
+
+def extract_key_candidates_from_text(
+    text: str,
+    trim_chars: Optional[List[str]] = None,
+    replace_with_space_chars: Optional[List[str]] = None
+) -> List[str]:
+    """
+    Extract and clean all [xxx] key patterns from newline-separated text.
+
+    Equivalent to extract_key_candidates_from_lines(text.split('\\n')), but
+    the whole text is scanned by a single regex, so lyric lines never reach
+    Python code.
+
+    Args:
+        text (str): Lyrics text, e.g. as returned by load_lyrics_file.
+        trim_chars (list of str, optional): Characters to treat as separators
+            (replace with space, e.g., ':').
+        replace_with_space_chars (list of str, optional): Characters to replace
+            with whitespace (e.g., '&', '/').
+
+    Returns:
+        list of str: Cleaned keys found in the text, lowercased and
+            whitespace-normalized.
+    """
+    if trim_chars is None:
+        trim_chars = DEFAULT_TRIM_CHARS
+    if replace_with_space_chars is None:
+        # Use a subset for extraction (no comma)
+        replace_with_space_chars = DEFAULT_REPLACE_WITH_SPACE_CHARS[:-1]
+    return _normalize_keys(_KEY_LINE_PATTERN.findall(text),
+                           trim_chars,
+                           replace_with_space_chars)
+
+
+def extract_key_candidates_from_file(
+    filepath: str,
+    trim_chars: Optional[List[str]] = None,
+    replace_with_space_chars: Optional[List[str]] = None
+) -> List[str]:
+    """
+    Extract and clean all [xxx] key patterns from a lyrics file without
+    reading or decoding the whole file.
+
+    The file is memory-mapped and scanned as bytes by a single regex; only
+    the matched keys are decoded. Gives the same keys as
+    extract_key_candidates_from_text(load_lyrics_file(filepath)) for UTF-8
+    files with LF or CRLF line endings, including key lines padded with
+    Unicode whitespace such as NBSP.
+
+    Args:
+        filepath (str): Path to the lyrics file.
+        trim_chars (list of str, optional): Characters to treat as separators
+            (replace with space, e.g., ':').
+        replace_with_space_chars (list of str, optional): Characters to replace
+            with whitespace (e.g., '&', '/').
+
+    Returns:
+        list of str: Cleaned keys found in the file, lowercased and
+            whitespace-normalized.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        UnicodeDecodeError: If a key cannot be decoded as UTF-8.
+    """
+    if trim_chars is None:
+        trim_chars = DEFAULT_TRIM_CHARS
+    if replace_with_space_chars is None:
+        # Use a subset for extraction (no comma)
+        replace_with_space_chars = DEFAULT_REPLACE_WITH_SPACE_CHARS[:-1]
+    with open(filepath, 'rb') as f:
+        # Empty files cannot be memory-mapped
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            raw_keys = _KEY_LINE_BYTES_PATTERN.findall(mm)
+    return _normalize_keys([key.decode('utf-8') for key in raw_keys],
+                           trim_chars,
+                           replace_with_space_chars)
+
+
+# Helper: normalize extracted raw keys, once per distinct raw key
+def _normalize_keys(
+    raw_keys: List[str],
+    trim_chars: Sequence[str],
+    replace_with_space_chars: Sequence[str]
+) -> List[str]:
+    # Labels such as [rza] or [chorus] repeat throughout a lyrics file
+    normalized = {
+        key: normalize_key_string(
+            key,
+            trim_chars=trim_chars,
+            replace_with_space_chars=replace_with_space_chars
+        )
+        for key in set(raw_keys)
+    }
+    return [normalized[key] for key in raw_keys]
 
 
 # Helper: normalize whitespace (replace multiple spaces with a single space)
@@ -126,13 +293,51 @@ def normalize_whitespace(s: str) -> str:
     Returns:
         str: String with normalized whitespace.
     """
-    return re.sub(r'\s+', ' ', s)
+    return _WS_PATTERN.sub(' ', s)
 
 
 # 4. Domain-Specific Functions
+def build_alias_index(alias_map: Dict[str, List[str]]) -> Dict[str, str]:
+    """
+    Invert an alias map into a lookup of normalized alias -> canonical name.
+
+    Build this once per alias map and pass it as ``alias_index`` to the
+    lookup functions below to avoid re-scanning every alias per key. If an
+    alias is listed under more than one canonical name, the first one wins.
+
+    Args:
+        alias_map (dict): Mapping of canonical_name -> list of aliases.
+
+    Returns:
+        dict: Mapping of normalized alias -> canonical performer name.
+    """
+    alias_index: Dict[str, str] = {}
+    for canonical, aliases in alias_map.items():
+        for alias in aliases:
+            alias_index.setdefault(normalize_key_string(alias), canonical)
+    return alias_index
+
+
+def alias_phrase_length(alias_index: Dict[str, str]) -> int:
+    """
+    Return the word count of the longest alias in an alias index.
+
+    No key sub-phrase longer than this can equal an alias, so alias
+    detection only needs to probe phrases up to this length.
+
+    Args:
+        alias_index (dict): Index from build_alias_index.
+
+    Returns:
+        int: Longest alias length in words, or 0 for an empty index.
+    """
+    return max((len(alias.split()) for alias in alias_index), default=0)
+
+
 def match_key_to_canonical(
     key: str,
-    alias_map: Dict[str, List[str]]
+    alias_map: Dict[str, List[str]],
+    alias_index: Optional[Dict[str, str]] = None
 ) -> Optional[str]:
     """
     Given a key (already cleaned/lowercased), return the canonical performer
@@ -141,23 +346,24 @@ def match_key_to_canonical(
     Args:
         key (str): Cleaned key to look up (e.g., 'rza', 'bobby digital').
         alias_map (dict): Mapping of canonical_name -> list of aliases.
+        alias_index (dict, optional): Prebuilt index from
+            build_alias_index(alias_map); built from alias_map on every
+            call if omitted, so pass one for repeated lookups.
 
     Returns:
         str or None: Canonical performer name if found, else None.
     """
-    key_norm = normalize_key_string(key)
-    for canonical, aliases in alias_map.items():
-        for alias in aliases:
-            alias_norm = normalize_key_string(alias)
-            if key_norm == alias_norm:
-                return canonical
-    return None
+    if alias_index is None:
+        alias_index = build_alias_index(alias_map)
+    return alias_index.get(normalize_key_string(key))
 
 
 def classify_key(
     key: str,
     alias_map: Dict[str, List[str]],
-    ignore_set: Set[str] = IGNORE_SET
+    ignore_set: AbstractSet[str] = IGNORE_SET,
+    alias_index: Optional[Dict[str, str]] = None,
+    max_len: Optional[int] = None
 ) -> str:
     """
     Classify a key as 'performer', 'ignore', or 'skip'.
@@ -165,34 +371,100 @@ def classify_key(
         key (str): The key to classify (should be lowercased and cleaned).
         alias_map (dict): Mapping of canonical_name -> list of aliases.
         ignore_set (set): Set of keys to ignore.
+        alias_index (dict, optional): Prebuilt index from
+            build_alias_index(alias_map); built from alias_map on every
+            call if omitted, so pass one for repeated lookups.
+        max_len (int, optional): alias_phrase_length(alias_index); worked
+            out on every call if omitted.
     Returns:
         str: 'performer', 'ignore', or 'skip'.
     """
+    if alias_index is None:
+        alias_index = build_alias_index(alias_map)
+    if max_len is None:
+        max_len = alias_phrase_length(alias_index)
     key_norm = normalize_key_string(key)
+    words = key_norm.split()
     # 1. Check for performer alias as whole word (normalized)
-    for aliases in alias_map.values():
-        for alias in aliases:
-            alias_norm = normalize_key_string(alias)
-            if f' {alias_norm} ' in f' {key_norm} ':
-                return 'performer'
+    phrases = iter_token_phrases(words, max_len)
+    if any(phrase in alias_index for phrase in phrases):
+        return 'performer'
 
-    # 2. Check for ignore: full-string match first
-    if key_norm in ignore_set:
+    # 2. Check for ignore: full string or every word in ignore_set
+    if is_ignore_key(key_norm, words, ignore_set):
         return 'ignore'
-    # 3. Check for ignore: if all words in key_norm are in ignore_set, ignore;
-    #    else, skip
-    words = [w for w in key_norm.split() if w.strip()]
-    if words and all(w in ignore_set for w in words):
-        return 'ignore'
-    # 4. Otherwise, skip
+    # 3. Otherwise, skip
     return 'skip'
 
 
+# Helper: ignore test on a key that is already normalized and split
+def is_ignore_key(
+    key_norm: str,
+    words: List[str],
+    ignore_set: AbstractSet[str] = IGNORE_SET
+) -> bool:
+    """
+    Return True if the key is in ignore_set, either as a whole or because
+      every one of its words is.
+    """
+    # Full-string match first
+    if key_norm in ignore_set:
+        return True
+    return bool(words) and set(words).issubset(ignore_set)
+
+
+# Helper: enumerate whole-word sub-phrases of a tokenized key
+def iter_token_phrases(
+    tokens: List[str],
+    max_len: Optional[int] = None
+) -> Iterator[str]:
+    """
+    Yield every contiguous run of tokens joined by single spaces.
+
+    A normalized alias matches a normalized key as a whole word exactly when
+    it equals one of these phrases, so alias detection becomes one dict
+    probe per phrase instead of a padded substring search per alias.
+
+    Args:
+        tokens (list of str): Whitespace-split tokens of a normalized key.
+        max_len (int, optional): Longest run to yield, in tokens (see
+            alias_phrase_length); unlimited if omitted.
+    Yields:
+        str: Each sub-phrase, e.g. 'bobby', 'bobby digital', 'digital'.
+    """
+    n = len(tokens)
+    if max_len is None:
+        max_len = n
+    for start in range(n):
+        for end in range(start + 1, min(n, start + max_len) + 1):
+            yield ' '.join(tokens[start:end])
+
+
+# Helper: canonical performers named by a key that is already split
+def performers_in_words(
+    words: List[str],
+    alias_index: Dict[str, str],
+    max_len: Optional[int] = None
+) -> Set[str]:
+    """
+    Return the canonical performers whose aliases appear as whole words in
+      the tokenized key (see iter_token_phrases). max_len defaults to
+      alias_phrase_length(alias_index).
+    """
+    if max_len is None:
+        max_len = alias_phrase_length(alias_index)
+    return {
+        alias_index[phrase]
+        for phrase in iter_token_phrases(words, max_len)
+        if phrase in alias_index
+    }
+
+
 # Helper: check if any line in a block is an ignore key
 def block_has_ignore_key(block):
     for line in block:
         # Check both key lines and non-key lines for ignore keys
-        key_match = re.match(r'^\[([^\]]+)\]$', line.strip())
+        key_match = _KEY_PATTERN.match(line.strip())
         if key_match:
             key_norm = normalize_key_string(key_match.group(1))
             if key_norm in IGNORE_SET:
@@ -208,164 +480,265 @@ def block_has_ignore_key(block):
 #   extract_key_candidates_from_lines
 def normalize_key_string(
     key: str,
-    trim_chars: Optional[List[str]] = None,
-    replace_with_space_chars: Optional[List[str]] = None
+    trim_chars: Optional[Sequence[str]] = None,
+    replace_with_space_chars: Optional[Sequence[str]] = None
 ) -> str:
+    if trim_chars is None and replace_with_space_chars is None:
+        # Common case: go straight to the cache with the default tuples
+        return _normalize_key_cached(
+            key, DEFAULT_TRIM_CHARS, DEFAULT_REPLACE_WITH_SPACE_CHARS
+        )
     if trim_chars is None:
         trim_chars = DEFAULT_TRIM_CHARS
     if replace_with_space_chars is None:
         replace_with_space_chars = DEFAULT_REPLACE_WITH_SPACE_CHARS
-    all_replace = list(set(
-        (replace_with_space_chars or []) +
-        (trim_chars or [])
-    ))
+    # Separator lists are passed as tuples so results can be memoized
+    return _normalize_key_cached(
+        key,
+        tuple(trim_chars or ()),
+        tuple(replace_with_space_chars or ())
+    )
+
+
+# Helper: memoized body of normalize_key_string (the same aliases and
+#   section labels are normalized over and over while scanning lyrics)
+@lru_cache(maxsize=8192)
+def _normalize_key_cached(
+    key: str,
+    trim_chars: Tuple[str, ...],
+    replace_with_space_chars: Tuple[str, ...]
+) -> str:
     # Remove brackets if present
     key = key.strip()
     if key.startswith('[') and key.endswith(']'):
         key = key[1:-1]
-    # Replace all separators with space
-    for c in all_replace:
-        key = key.replace(c, ' ')
-    # Normalize whitespace (multiple spaces to single)
-    key = normalize_whitespace(key)
+    separators = replace_with_space_chars + trim_chars
+    # Fast path: plain lowercase labels such as 'rza' or 'method man' are
+    #   already normalized apart from surrounding whitespace
+    if (separators == _DEFAULT_SEPARATORS and key.islower()
+            and not _DEFAULT_NORMALIZE_PATTERN.search(key)):
+        return key.strip()
+    # Replace all separators with space in a single translate pass
+    if separators == _DEFAULT_SEPARATORS:
+        key = key.translate(_TRANS_TABLE)
+    elif all(len(c) == 1 for c in separators):
+        key = key.translate(_separator_table(separators))
+    else:
+        # Multi-character separators cannot go in a translate table
+        for c in set(separators):
+            key = key.replace(c, ' ')
+    # Normalize whitespace (multiple spaces to single); most labels and
+    #   aliases ('rza', 'bobby digital') have nothing to collapse
+    if _WS_RUN_PATTERN.search(key):
+        key = normalize_whitespace(key)
     # Lowercase and strip
     key = key.lower().strip()
     return key
 
 
+# Helper: translate table mapping each separator character to a space
+@lru_cache(maxsize=None)
+def _separator_table(separators: Tuple[str, ...]) -> Dict[int, str]:
+    return str.maketrans(dict.fromkeys(separators, ' '))
+
+
 # Helper: find all canonical performers matching a normalized key string
 def find_canonical_performers(
-    key_norm: str,
-    alias_map: Dict[str, List[str]]
+    key: str,
+    alias_map: Dict[str, List[str]],
+    alias_index: Optional[Dict[str, str]] = None
 ) -> Set[str]:
     """
-    Given a normalized key string and alias map, return all matching canonical
-     performer names. Matches both whole-word aliases and per-part
-     (split by spaces) to maximize robust performer attribution.
+    Given a key string and alias map, return all matching canonical
+     performer names. The key may be raw or normalized: whole-word aliases
+     are matched in its normalized form, and each space-separated part is
+     also normalized and looked up on its own, to maximize robust performer
+     attribution.
+     Pass a prebuilt alias_index (see build_alias_index) to skip rebuilding
+     it on every call.
     """
-    performers = set()
-    for canonical, aliases in alias_map.items():
-        for alias in aliases:
-            alias_norm = normalize_key_string(alias)
-            if f' {alias_norm} ' in f' {key_norm} ':
-                performers.add(canonical)
-    for part in key_norm.split():
-        canonical = match_key_to_canonical(part, alias_map)
+    if alias_index is None:
+        alias_index = build_alias_index(alias_map)
+    # Normalizing first lets raw keys such as 'Method Man & Redman' match
+    #   multi-word aliases; normalized keys pass through unchanged
+    performers = performers_in_words(
+        normalize_key_string(key).split(), alias_index
+    )
+    parts = key.split()
+    # Per-part pass: normalize each part on its own so parts like 'RZA',
+    #   'rza:' or 'raekwon,' still resolve
+    for part in parts:
+        canonical = alias_index.get(normalize_key_string(part))
         if canonical:
             performers.add(canonical)
     return performers
 
 
 # 5. Section Attribution Logic
+# Helper: decide how the lines following a raw [key] label are attributed
+def resolve_key(
+    key_raw: str,
+    alias_index: Dict[str, str],
+    ignore_set: AbstractSet[str] = IGNORE_SET,
+    max_len: Optional[int] = None
+) -> Tuple[str, Tuple[str, ...]]:
+    """
+    Resolve a raw key (bracket contents) to an attribution mode and the
+      performers it names.
+    Args:
+        key_raw: Key text as found in the lyrics, e.g. 'Raekwon & Ghost'.
+        alias_index: Index from build_alias_index.
+        ignore_set: Set of keys to ignore.
+        max_len: alias_phrase_length(alias_index), if already known.
+    Returns:
+        ('performer', (canonical,)) for exactly one performer, otherwise
+        ('ignore', ()) or ('skip', ()); keys naming several performers are
+        skipped.
+    """
+    # Normalize and split once; the performer lookup doubles as the
+    #   'performer' classification
+    key_norm = normalize_key_string(key_raw)
+    words = key_norm.split()
+    performers = performers_in_words(words, alias_index, max_len)
+    if len(performers) == 1:
+        return 'performer', tuple(performers)
+    if performers:
+        # If more than one performer, treat as skip
+        return 'skip', ()
+    if is_ignore_key(key_norm, words, ignore_set):
+        return 'ignore', ()
+    return 'skip', ()
+
+
+# Helper: scan lyric lines, passing each attributed line to its performer
+def _attribute_lines(
+    lines: Iterable[str],
+    alias_index: Dict[str, str],
+    ignore_set: AbstractSet[str],
+    sink_for: Callable[[str], Callable[[str], None]]
+) -> None:
+    """
+    Core attribution scan shared by split_lyrics_by_performer and
+      write_performer_files_streaming. sink_for(performer) returns the
+      callable each line attributed to that performer is passed to; it is
+      called once per performer for each distinct key.
+    """
+    # Sink of each current performer; empty before the first key and after
+    #   ignore/skip keys
+    current_sinks: Tuple[Callable[[str], None], ...] = ()
+    # Sinks for each distinct raw key seen so far; labels such as [rza] or
+    #   [chorus] repeat throughout a lyrics file
+    resolved_keys: Dict[str, Tuple[Callable[[str], None], ...]] = {}
+    # Longest alias in words, worked out once for every key resolved below
+    max_len = alias_phrase_length(alias_index)
+
+    for line in lines:
+        # Check for [key] line; lyric lines without a '[' skip the strip
+        #   and regex match entirely
+        key_match = '[' in line and _KEY_PATTERN.match(line.strip())
+        if key_match:
+            key_raw = key_match.group(1)
+            sinks = resolved_keys.get(key_raw)
+            if sinks is None:
+                mode, performers = resolve_key(key_raw, alias_index,
+                                               ignore_set, max_len)
+                if mode == 'performer':
+                    sinks = tuple(sink_for(p) for p in performers)
+                else:
+                    sinks = ()
+                resolved_keys[key_raw] = sinks
+            # Always reset performers on new key
+            current_sinks = sinks
+            continue  # Don't attribute key lines themselves
+
+        # Non-key line; ignore/skip keys and lines before the first key
+        #   leave current_sinks empty, so nothing is attributed
+        if len(current_sinks) == 1:
+            current_sinks[0](line)
+        else:
+            for sink in current_sinks:
+                sink(line)
+
+
 def split_lyrics_by_performer(
-    lines: List[str],
+    lines: Iterable[str],
     alias_map: Dict[str, List[str]],
-    ignore_set: Set[str] = IGNORE_SET
+    ignore_set: AbstractSet[str] = IGNORE_SET,
+    alias_index: Optional[Dict[str, str]] = None
 ) -> Dict[str, List[str]]:
     """
     Process lyrics lines, attributing text chunks to performers and skipping
       lines after ignore/skip keys.
     Args:
-        lines: List of lyric lines (including [key] lines).
+        lines: Lyric lines (including [key] lines); any iterable, such as
+            the generator returned by iter_lyrics_lines.
         alias_map: Mapping of canonical performer names to aliases.
         ignore_set: Set of keys to ignore.
+        alias_index: Optional prebuilt index from build_alias_index; built
+            once from alias_map if omitted.
     Returns:
-        Dict of performer name -> list of attributed lines.
+        Dict of performer name -> list of attributed lines. Only performers
+        with at least one attributed line are present.
     """
-    performer_chunks: Dict[str, List[str]] = {
-        c: [] for c in alias_map
+    if alias_index is None:
+        alias_index = build_alias_index(alias_map)
+    # Lists are created only for performers whose keys actually appear
+    performer_chunks: DefaultDict[str, List[str]] = defaultdict(list)
+    # Lines go straight to the bound append of each performer's list
+    _attribute_lines(lines, alias_index, ignore_set,
+                     lambda performer: performer_chunks[performer].append)
+    # Return a plain dict (missing performers raise KeyError) without the
+    #   performers whose keys were never followed by a line
+    return {
+        performer: chunk
+        for performer, chunk in performer_chunks.items()
+        if chunk
     }
-    current_mode = None  # 'performer', 'ignore', 'skip', or None
-    current_performers = []  # List of canonical performer names
 
-    for line in lines:
-        # Check for [key] line
-        key_match = re.match(r'^\[([^\]]+)\]$', line.strip())
-        if key_match:
-            key_raw = key_match.group(1)
-            key_norm = normalize_key_string(key_raw)
-            key_type = classify_key(key_norm, alias_map, ignore_set)
-            # Always reset mode and performers on new key
-            if key_type == 'performer':
-                performers = find_canonical_performers(key_norm, alias_map)
-                # If more than one performer, treat as skip
-                if len(performers) > 1:
-                    current_mode = 'skip'
-                    current_performers = []
-                elif len(performers) == 1:
-                    current_mode = 'performer'
-                    current_performers = list(performers)
-                else:
-                    current_mode = None
-                    current_performers = []
-            elif key_type == 'ignore':
-                current_mode = 'ignore'
-                current_performers = []
-            elif key_type == 'skip':
-                current_mode = 'skip'
-                current_performers = []
-            else:
-                current_mode = None
-                current_performers = []
-            continue  # Don't attribute key lines themselves
 
-        # Non-key line
-        if current_mode == 'performer' and current_performers:
-            for performer in current_performers:
-                performer_chunks[performer].append(line)
-        # If ignore or skip, do not attribute
-        # If current_mode is None, do not attribute
-
-    return performer_chunks
+# Helper: system prompt shared by every conversation for a performer
+@lru_cache(maxsize=None)
+def _system_prompt(performer: str) -> str:
+    return (
+        f"You are Wu-Tang Clan member {performer}. "
+        "When a user prompts you with one of your lyrics, "
+        "you deliver the next line."
+    )
 
 
 # Helper: split lines into JSONL prompt/completion pairs based on verse breaks
 def format_chatml_conversations(block: List[str],
                                 performer: str) -> List[Dict[str, list]]:
-    """Format a block of lyric lines into ChatML conversation objects."""
-    system_message = {
-        "role": "system",
-        "content": (
-            f"You are Wu-Tang Clan member {performer}. "
-            "When a user prompts you with one of your lyrics, "
-            "you deliver the next line."
-        )
-    }
-    pairs = []
-    for i in range(len(block) - 1):
-        user_msg = block[i].strip()
-        assistant_msg = block[i + 1].strip()
-        messages = [
+    """
+    Format a block of lyric lines into ChatML conversation objects.
+      Lines are expected to be stripped already (see iter_jsonl_pairs).
+    """
+    system_message = {"role": "system", "content": _system_prompt(performer)}
+    return [
+        {"conversations": [
             system_message,
             {"role": "user", "content": user_msg},
             {"role": "assistant", "content": assistant_msg}
-        ]
-        pairs.append({"conversations": messages})
-    return pairs
+        ]}
+        for user_msg, assistant_msg in zip(block, block[1:])
+    ]
 
 
 def format_sharegpt_conversations(block: List[str],
                                   performer: str) -> List[list]:
-    """Format a block of lyric lines into ShareGPT conversation lists."""
-    system_message = {
-        "from": "system",
-        "value": (
-            f"You are Wu-Tang Clan member {performer}. "
-            "When a user prompts you with one of your lyrics, "
-            "you deliver the next line."
-        )
-    }
-    pairs = []
-    for i in range(len(block) - 1):
-        user_msg = block[i].strip()
-        assistant_msg = block[i + 1].strip()
-        messages = [
+    """
+    Format a block of lyric lines into ShareGPT conversation lists.
+      Lines are expected to be stripped already (see iter_jsonl_pairs).
+    """
+    system_message = {"from": "system", "value": _system_prompt(performer)}
+    return [
+        [
             system_message,
             {"from": "human", "value": user_msg},
             {"from": "gpt", "value": assistant_msg}
         ]
-        pairs.append(messages)
-    return pairs
+        for user_msg, assistant_msg in zip(block, block[1:])
+    ]
 
 
 def split_lines_to_jsonl_pairs(
@@ -384,53 +757,102 @@ def split_lines_to_jsonl_pairs(
         List of dicts (ChatML) or lists (ShareGPT) for Unsloth chat_template
         format.
     """
-    chat_pairs = []
-    block = []
+    return list(iter_jsonl_pairs(lines, performer, format=format))
 
-    def is_key_line(line):
-        return re.match(r'^\[([^\]]+)\]$', line.strip()) is not None
 
-    block_has_key_line = False
-    for line in lines:
-        if is_key_line(line) or line.strip() == '':
-            # On key line or empty line, process current block
-            if block:
-                # If any line in the block is a key line, skip the block
-                if (len(block) >= 2 and not block_has_key_line
-                        and not block_has_ignore_key(block)):
-                    if format == "chatml":
-                        chat_pairs.extend(
-                            format_chatml_conversations(block, performer)
-                        )
-                    elif format == "sharegpt":
-                        chat_pairs.extend(
-                            format_sharegpt_conversations(block, performer)
-                        )
-                block = []
-                block_has_key_line = False
+def iter_jsonl_pairs(
+    lines: Iterable[str],
+    performer: str,
+    format: str = "chatml"
+) -> Iterator[dict]:
+    """
+    Lazily yield the objects split_lines_to_jsonl_pairs would return, one
+    verse block at a time, so they can be serialized as they are produced.
+    Args:
+        lines: Lyric lines (may include empty lines for verse breaks).
+        performer: Name of the performer for the system prompt.
+        format: Output format ('chatml' or 'sharegpt'); anything else
+            yields nothing.
+    Yields:
+        dict: One ChatML or ShareGPT conversation object per line pair.
+    """
+    if format == "chatml":
+        formatter = format_chatml_conversations
+    elif format == "sharegpt":
+        formatter = format_sharegpt_conversations
+    else:
+        return
+
+    def is_verse_line(line):
+        # Key lines and empty lines both end the current block
+        stripped = line.strip()
+        return stripped != '' and _KEY_PATTERN.match(stripped) is None
+
+    for is_verse, group in groupby(lines, key=is_verse_line):
+        if not is_verse:
             continue
-        # Only add non-key, non-empty lines to block
-        if not is_key_line(line) and line.strip() != '':
-            block.append(line)
-    # Process any remaining block
-    if block:
-        if (
-            len(block) >= 2
-            and not block_has_key_line
-            and not block_has_ignore_key(block)
-        ):
-            if format == "chatml":
-                chat_pairs.extend(
-                    format_chatml_conversations(block, performer)
-                )
-            elif format == "sharegpt":
-                chat_pairs.extend(
-                    format_sharegpt_conversations(block, performer)
-                )
-    return chat_pairs
+        block = [line.strip() for line in group]
+        # Blocks need a prompt and a reply, and must not carry ignore keys
+        if len(block) >= 2 and not block_has_ignore_key(block):
+            yield from formatter(block, performer)
 
 
 # 6. Output Functions
+# Helper: pair each writable performer with its file-system-safe name
+def _iter_valid_performers(
+    performer_chunks: Dict[str, List[str]],
+    alias_map: Optional[Dict[str, List[str]]] = None
+) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (performer, safe_name) for each performer in performer_chunks that
+      is also a key of alias_map (or every performer if alias_map is None).
+      safe_name replaces non-alphanumeric characters and spaces with '_'.
+    """
+    for performer in performer_chunks:
+        if alias_map is not None and performer not in alias_map:
+            continue
+        yield performer, _safe_performer_name(performer)
+
+
+# Helper: file-system-safe name for a performer (shared by all writers)
+@lru_cache(maxsize=None)
+def _safe_performer_name(performer: str) -> str:
+    return _SAFE_NAME_PATTERN.sub('_', performer).replace(' ', '_')
+
+
+def _unique_targets(
+    performer_chunks: Dict[str, List[str]],
+    alias_map: Optional[Dict[str, List[str]]] = None,
+    skip_empty: bool = False
+) -> List[Tuple[str, str]]:
+    """
+    List (performer, safe_name) write targets with one entry per safe_name,
+      keeping the last performer as a sequential write loop would, so
+      concurrent writers never race on the same output file. With
+      skip_empty, performers without lines are dropped before deduplicating,
+      so they never displace a performer sharing their safe_name.
+    """
+    by_name = {
+        safe_name: performer
+        for performer, safe_name in _iter_valid_performers(performer_chunks,
+                                                           alias_map)
+        if not skip_empty or performer_chunks[performer]
+    }
+    return [(performer, safe_name) for safe_name, performer in by_name.items()]
+
+
+def _map_in_threads(func: Callable, items: Iterable) -> None:
+    """
+    Call func on every item using a thread pool, re-raising the first error.
+      File writes release the GIL, so per-performer writes overlap on disk.
+    """
+    workers = min(32, os.cpu_count() or 8)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Consume the results so worker exceptions propagate to the caller
+        for _ in executor.map(func, items):
+            pass
+
+
 def write_performer_files(
     performer_chunks: Dict[str, List[str]],
     out_dir: str,
@@ -438,7 +860,8 @@ def write_performer_files(
 ) -> None:
     """
     Write each performer's lyrics to a file in the output directory.
-    Only valid performer keys (present in alias_map) are written.
+    Only valid performer keys (present in alias_map) with at least one line
+    are written.
     Args:
         performer_chunks: Dict of performer name -> list of lines.
         out_dir: Output directory path.
@@ -446,20 +869,71 @@ def write_performer_files(
             If provided, only write files for these keys.
     """
     os.makedirs(out_dir, exist_ok=True)
-    valid_performers = set(performer_chunks.keys())
-    if alias_map is not None:
-        valid_performers = set(alias_map.keys())
-    for performer, lines in performer_chunks.items():
-        if alias_map is not None and performer not in valid_performers:
-            continue
-        safe_name = ''.join(
-            c if c.isalnum() or c in (' ', '_') else '_'
-            for c in performer
-        ).replace(' ', '_')
+
+    def _write_one(target: Tuple[str, str]) -> None:
+        performer, safe_name = target
         out_path = os.path.join(out_dir, f"{safe_name}.txt")
         with open(out_path, "w", encoding="utf-8") as f:
-            for line in lines:
+            # One write per file instead of one per line
+            f.write("\n".join(performer_chunks[performer]) + "\n")
+
+    # Performers without lines get no file
+    _map_in_threads(
+        _write_one,
+        _unique_targets(performer_chunks, alias_map, skip_empty=True)
+    )
+
+
+def write_performer_files_streaming(
+    lines: Iterable[str],
+    out_dir: str,
+    alias_map: Dict[str, List[str]],
+    ignore_set: AbstractSet[str] = IGNORE_SET,
+    alias_index: Optional[Dict[str, str]] = None
+) -> None:
+    """
+    Attribute lyrics lines and write them to per-performer text files as
+      they are scanned, without collecting them in memory first. Produces
+      the same files as write_performer_files(split_lyrics_by_performer(
+      lines, alias_map, ignore_set), out_dir, alias_map) as long as no two
+      canonical names share a safe file name; performers that do share one
+      are appended to the same file in scan order (write_performer_files
+      keeps only one of them).
+    Args:
+        lines: Lyric lines (including [key] lines), e.g. from
+            iter_lyrics_lines.
+        out_dir: Output directory path.
+        alias_map: Mapping of canonical performer names to aliases.
+        ignore_set: Set of keys to ignore.
+        alias_index: Optional prebuilt index from build_alias_index.
+    """
+    if alias_index is None:
+        alias_index = build_alias_index(alias_map)
+    os.makedirs(out_dir, exist_ok=True)
+
+    with ExitStack() as stack:
+        # Keyed by safe name so performers sharing a file name reuse one
+        #   handle instead of truncating each other's file
+        handles: Dict[str, TextIO] = {}
+
+        def _sink_for(performer: str) -> Callable[[str], None]:
+            safe_name = _safe_performer_name(performer)
+            out_path = os.path.join(out_dir, f"{safe_name}.txt")
+
+            def _write(line: str) -> None:
+                f = handles.get(safe_name)
+                if f is None:
+                    # Files are opened lazily on a performer's first line,
+                    #   so performers without lines get no file
+                    f = stack.enter_context(
+                        open(out_path, "w", encoding="utf-8",
+                             buffering=_WRITE_BUFFER_SIZE)
+                    )
+                    handles[safe_name] = f
                 f.write(line + "\n")
+            return _write
+
+        _attribute_lines(lines, alias_index, ignore_set, _sink_for)
 
 
 def write_performer_jsonl(
@@ -480,25 +954,23 @@ def write_performer_jsonl(
         format:             Output format ('chatml' or 'sharegpt').
     """
     os.makedirs(out_dir, exist_ok=True)
-    valid_performers = set(performer_chunks.keys())
-    if alias_map is not None:
-        valid_performers = set(alias_map.keys())
-    for performer, lines in performer_chunks.items():
-        if alias_map is not None and performer not in valid_performers:
-            continue
-        safe_name = ''.join(
-            c if c.isalnum() or c in (' ', '_') else '_'
-            for c in performer
-        ).replace(' ', '_')
+
+    def _write_one(target: Tuple[str, str]) -> None:
+        performer, safe_name = target
         out_path = os.path.join(out_dir, f"{safe_name}.jsonl")
-        chat_pairs = split_lines_to_jsonl_pairs(
-            lines,
+        chat_pairs = iter_jsonl_pairs(
+            performer_chunks[performer],
             performer,
             format=format
         )
-        with open(out_path, "w", encoding="utf-8") as f:
-            for obj in chat_pairs:
-                f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+        with open(out_path, "w", encoding="utf-8",
+                  buffering=_WRITE_BUFFER_SIZE) as f:
+            # Objects are encoded and buffered as they are produced
+            f.writelines(
+                _encode_json(obj) + "\n" for obj in chat_pairs
+            )
+
+    _map_in_threads(_write_one, _unique_targets(performer_chunks, alias_map))
 
 
 def load_lyrics_file(filepath: str) -> str:
@@ -511,12 +983,43 @@ def load_lyrics_file(filepath: str) -> str:
     Returns:
         str: Full contents of the file.
 
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        UnicodeDecodeError: If the file cannot be decoded as UTF-8.
+    """
+    # One bulk decode instead of TextIOWrapper's incremental decoding
+    with open(filepath, 'rb') as f:
+        text = f.read().decode('utf-8')
+    # Match text-mode universal newlines ('\r\n' and '\r' become '\n')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def iter_lyrics_lines(filepath: str) -> Iterator[str]:
+    """
+    Lazily yield the lines of a lyrics file without trailing newlines.
+
+    Yields the same lines as load_lyrics_file(...).splitlines(), including
+    splits on separators such as '\x0c' or '\u2028', but the file is never
+    held in memory as a whole, so it can be fed directly to
+    split_lyrics_by_performer.
+
+    Args:
+        filepath (str): Path to the lyrics file.
+
+    Yields:
+        str: Each line of the file, without its line ending.
+
     Raises:
         FileNotFoundError: If the file does not exist.
         UnicodeDecodeError: If the file cannot be decoded as UTF-8.
     """
     with open(filepath, 'r', encoding='utf-8') as f:
-        return f.read()
+        for line in f:
+            # splitlines() drops the '\n' and splits on the other line
+            #   boundaries it knows; a blank line yields no parts
+            yield from line.splitlines() or ('',)
 
 
 # 7. CLI Entry Point
@@ -586,16 +1089,6 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
 
-    lyrics_path = Path(args.input_file)
-    print(f"Loading lyrics from: {lyrics_path}")
-    try:
-        text = load_lyrics_file(str(lyrics_path))
-    except Exception as e:
-        print(f"Error loading file: {e}")
-        sys.exit(1)
-
-    lines = text.splitlines()
-
     alias_path = Path(__file__).parent / "performer_aliases.json"
     try:
         with open(alias_path, "r", encoding="utf-8") as f:
@@ -604,12 +1097,28 @@ if __name__ == "__main__":
         print(f"Error loading alias map: {e}")
         sys.exit(1)
 
-    performer_chunks = split_lyrics_by_performer(lines, alias_map, IGNORE_SET)
+    alias_index = build_alias_index(alias_map)
+
+    lyrics_path = Path(args.input_file)
+    print(f"Loading lyrics from: {lyrics_path}")
+    try:
+        # Stream lines straight from the file into the splitter
+        performer_chunks = split_lyrics_by_performer(
+            iter_lyrics_lines(str(lyrics_path)),
+            alias_map,
+            IGNORE_SET,
+            alias_index=alias_index
+        )
+    except Exception as e:
+        print(f"Error loading file: {e}")
+        sys.exit(1)
 
     out_dir = args.output_dir
 
     if args.performer:
-        canonical = match_key_to_canonical(args.performer, alias_map)
+        canonical = match_key_to_canonical(
+            args.performer, alias_map, alias_index=alias_index
+        )
         if canonical is None:
             print(
                 "Error: Performer or alias "
@@ -649,7 +1158,9 @@ if __name__ == "__main__":
             out_dir,
             alias_map=alias_map,
         )
-        count = len([k for k in performer_chunks if k in alias_map])
+        count = len([
+            k for k, v in performer_chunks.items() if k in alias_map and v
+        ])
         print("Done.", f"{count} performer files written.")
 
     print("\nNote: For custom LLM formats, use Unsloth's chat_template"
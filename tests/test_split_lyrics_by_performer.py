@@ -1,34 +1,81 @@
 import unittest
 import os
+import re
+import sys
 import tempfile
-import shutil
 import json
 
 from io import StringIO
+from collections import deque
 from contextlib import contextmanager
-
-import pycodestyle
+from functools import lru_cache
 
 from src.split_lyrics_by_performer import *
 
 
-# Context manager for temporary directories
+# Context manager for temporary directories (removed even if a test fails)
 @contextmanager
 def tempdir():
-    dirpath = tempfile.mkdtemp()
-    try:
+    with tempfile.TemporaryDirectory() as dirpath:
         yield dirpath
-    finally:
-        shutil.rmtree(dirpath)
 
 
+# Context manager yielding (path, directory) of a temporary lyrics file
+@contextmanager
 def make_test_file(lines):
-    tmpdir = tempfile.mkdtemp()
-    testfile = os.path.join(tmpdir, 'test.txt')
-    with open(testfile, 'w', encoding='utf-8') as f:
-        for line in lines:
-            f.write(line + '\n')
-    return testfile, tmpdir
+    with tempdir() as tmpdir:
+        testfile = os.path.join(tmpdir, 'test.txt')
+        with open(testfile, 'w', encoding='utf-8') as f:
+            f.write(''.join(line + '\n' for line in lines))
+        yield testfile, tmpdir
+
+
+# Read a written performer file back as a list of lines in one read call
+def read_output_lines(path):
+    with open(path, 'rb') as f:
+        return f.read().decode('utf-8').splitlines()
+
+
+# This module as registered in sys.modules; __import__(__name__) would return
+#   the top-level 'tests' package when imported as tests.test_...
+THIS_MODULE = sys.modules[__name__]
+
+# Repository paths, resolved once at import
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(TEST_DIR), 'src')
+
+# Repository JSON fixtures, parsed at most once per test run
+ALIAS_PATH = os.path.join(SRC_DIR, 'performer_aliases.json')
+LABELED_PATH = os.path.join(TEST_DIR, 'unique_keys_labeled.json')
+
+
+@lru_cache(maxsize=None)
+def load_json_fixture(path):
+    """Load a JSON fixture once; callers must not mutate the result."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# Representative (canonical, aliases) pairs from performer_aliases.json
+REAL_ALIAS_CASES = (
+    ("rza", ("rza", "bobby digital", "the abbot")),
+    ("gza", ("gza", "the genius")),
+    ("method man", ("method man", "meth", "johnny blaze")),
+    ("ghostface killah", ("ghostface killah", "ghostface", "tony starks")),
+    ("inspectah deck", ("inspectah deck", "deck")),
+    ("ol' dirty bastard", ("ol' dirty bastard", "odb", "dirt mcgirt")),
+    ("masta killa", ("masta killa", "noodles")),
+    ("u-god", ("u-god", "golden arms")),
+    ("cappadonna", ("cappadonna", "cappa")),
+)
+
+
+# Collapse whitespace runs so key comparisons ignore spacing differences
+_WS_RE = re.compile(r'\s+')
+
+
+def norm_spaces(s):
+    return _WS_RE.sub(' ', s).strip()
 
 
 # 1. Import the Lyrics Text File
@@ -54,25 +101,55 @@ class TestImportLyricsFile(unittest.TestCase):
 
     def test_file_not_found(self):
         """Test handling of file not found error."""
-        missing_path = os.path.join(
-            os.path.dirname(__file__),
-            'this_file_does_not_exist.txt'
-        )
+        missing_path = os.path.join(TEST_DIR, 'this_file_does_not_exist.txt')
         with self.assertRaises(FileNotFoundError):
             load_lyrics_file(missing_path)
 
     def test_encoding_error(self):
         """Test handling of encoding errors when reading file."""
         # Create a file with invalid utf-8 bytes
-        tmpdir = tempfile.mkdtemp()
-        bad_file = os.path.join(tmpdir, 'bad_encoding.txt')
-        # Write some bytes that are not valid UTF-8
-        with open(bad_file, 'wb') as f:
-            f.write(b'\xff\xfe\xfd\xfc')
-        # Now try to read it as utf-8, should raise UnicodeDecodeError
-        with self.assertRaises(UnicodeDecodeError):
-            load_lyrics_file(bad_file)
-        shutil.rmtree(tmpdir)
+        with tempdir() as tmpdir:
+            bad_file = os.path.join(tmpdir, 'bad_encoding.txt')
+            # Write some bytes that are not valid UTF-8
+            with open(bad_file, 'wb') as f:
+                f.write(b'\xff\xfe\xfd\xfc')
+            # Now try to read it as utf-8, should raise UnicodeDecodeError
+            with self.assertRaises(UnicodeDecodeError):
+                load_lyrics_file(bad_file)
+
+    def test_iter_lyrics_lines_matches_splitlines(self):
+        """
+        Test that streaming a lyrics file yields the same lines as loading
+          it and calling splitlines().
+        """
+        lines = ["[rza]", "RZA verse 1", "", "[chorus]", "Chorus line"]
+        with make_test_file(lines) as (testfile, _):
+            streamed = iter_lyrics_lines(testfile)
+            self.assertNotIsInstance(streamed, list)
+            self.assertEqual(
+                list(streamed),
+                load_lyrics_file(testfile).splitlines()
+            )
+            self.assertEqual(
+                extract_key_candidates_from_lines(iter_lyrics_lines(testfile)),
+                ["rza", "chorus"]
+            )
+        # Line boundaries other than '\n' that str.splitlines() splits on
+        separators = ['\r', '\r\n', '\x0b', '\x0c', '\x1c', '\x1d', '\x1e',
+                      '\x85', '\u2028', '\u2029']
+        for sep in separators:
+            text = "[RZA]\nline" + sep + "[GZA]\nx" + sep + "\n\ny" + sep
+            with self.subTest(sep=repr(sep)), tempdir() as tmpdir:
+                testfile = os.path.join(tmpdir, "lyrics.txt")
+                with open(testfile, "wb") as f:
+                    f.write(text.encode("utf-8"))
+                self.assertEqual(list(iter_lyrics_lines(testfile)),
+                                 load_lyrics_file(testfile).splitlines())
+                self.assertEqual(
+                    split_lyrics_by_performer(iter_lyrics_lines(testfile),
+                                              RZA_GZA_ALIAS_MAP)["gza"][0],
+                    "x"
+                )
 
 
 # 2. Trim and Extract Key Candidates
@@ -114,11 +191,8 @@ class TestTrimAndExtractKeyCandidates(unittest.TestCase):
         ]
         result = extract_key_candidates_from_lines(lines)
         # Normalize double spaces to single for comparison
-
-        def norm(s):
-            return ' '.join(s.split())
-        result = [norm(k) for k in result]
-        expected = [norm(k) for k in expected]
+        result = [norm_spaces(k) for k in result]
+        expected = [norm_spaces(k) for k in expected]
         self.assertEqual(result, expected)
 
     def test_custom_trim_and_replace(self):
@@ -131,37 +205,103 @@ class TestTrimAndExtractKeyCandidates(unittest.TestCase):
             trim_chars=['*'],
             replace_with_space_chars=['+']
         )
-
-        def norm(s):
-            return ' '.join(s.split())
-        result = [norm(k) for k in result]
-        expected = [norm(k) for k in expected]
+        result = [norm_spaces(k) for k in result]
+        expected = [norm_spaces(k) for k in expected]
         self.assertEqual(result, expected)
 
+    def test_normalize_key_string_sequence_types(self):
+        """
+        Test that custom separator chars may be passed as lists or tuples
+          (normalization is memoized on hashable arguments).
+        """
+        as_list = normalize_key_string("[RZA*ODB]", trim_chars=['*'])
+        as_tuple = normalize_key_string("[RZA*ODB]", trim_chars=('*',))
+        self.assertEqual(as_list, "rza odb")
+        self.assertEqual(as_tuple, as_list)
+        self.assertEqual(normalize_key_string("[RZA*ODB]"), "rza*odb")
+
+    def test_extract_key_candidates_from_file(self):
+        """
+        Test that the memory-mapped file scan finds the same keys as the
+          text scan, including non-ASCII keys, and handles empty files.
+        """
+        lines = [
+            "[RZA & GZA]",
+            "lyric with [inline] brackets",
+            "  [Ghostface/Raekwon]  ",
+            "[Pete Rock & Ol' Dirty Bastard]",
+            "[Cappadonna: Été]"
+        ]
+        with make_test_file(lines) as (testfile, tmpdir):
+            self.assertEqual(
+                extract_key_candidates_from_file(testfile),
+                extract_key_candidates_from_text(load_lyrics_file(testfile))
+            )
+            empty = os.path.join(tmpdir, "empty.txt")
+            open(empty, "w").close()
+            self.assertEqual(extract_key_candidates_from_file(empty), [])
+
+    def test_extract_key_candidates_from_file_unicode_padding(self):
+        """
+        Test that key lines padded with Unicode whitespace (NBSP, em space,
+          ideographic space) are found by the file scan, as by the text and
+          line scans.
+        """
+        lines = ["[RZA]\xa0", "[GZA]", "\u2003[Meth]", "[Ghost]\u3000"]
+        expected = ["rza", "gza", "meth", "ghost"]
+        with make_test_file(lines) as (testfile, tmpdir):
+            self.assertEqual(extract_key_candidates_from_file(testfile),
+                             expected)
+            self.assertEqual(
+                extract_key_candidates_from_text(load_lyrics_file(testfile)),
+                expected
+            )
+        self.assertEqual(extract_key_candidates_from_lines(lines), expected)
+
+    def test_extract_key_candidates_from_text(self):
+        """
+        Test that scanning whole text finds the same keys as scanning its
+          lines, ignoring inline brackets and keys split across lines.
+        """
+        lines = [
+            "[RZA & GZA]",
+            "  [ghostface/rza]  ",
+            "lyric with [inline] brackets",
+            "",
+            "[u-god:]\r",
+            "[broken",
+            "key]",
+            "[masta killa]"
+        ]
+        text = "\n".join(lines)
+        self.assertEqual(extract_key_candidates_from_text(text),
+                         extract_key_candidates_from_lines(lines))
+        self.assertEqual(
+            extract_key_candidates_from_text(text),
+            ["rza gza", "ghostface rza", "u god", "masta killa"]
+        )
+
 
 # 3. Identify Performer Keys
 class TestIdentifyPerformerKeys(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Real alias mapping shared by the tests below
+        cls.alias_map = load_json_fixture(ALIAS_PATH)
+
     def test_multi_performer_key_maps_to_all_canonical(self):
         """
         Test that a key like 'odb rza' identifies both 'ol' dirty bastard'
           and 'rza' using the real alias mapping.
         """
-        alias_path = os.path.abspath(
-            os.path.join(
-                os.path.dirname(__file__),
-                '../src/performer_aliases.json'
-            )
-        )
-        with open(alias_path, 'r', encoding='utf-8') as f:
-            alias_map = json.load(f)
+        alias_map = self.alias_map
         # Split the key and map each part
         key = 'odb rza'
-        parts = key.split()
-        mapped = set()
-        for part in parts:
-            canonical = match_key_to_canonical(part, alias_map)
-            if canonical:
-                mapped.add(canonical)
+        mapped = frozenset(
+            canonical
+            for part in key.split()
+            if (canonical := match_key_to_canonical(part, alias_map))
+        )
         self.assertIn("ol' dirty bastard", mapped)
         self.assertIn("rza", mapped)
 
@@ -170,35 +310,13 @@ class TestIdentifyPerformerKeys(unittest.TestCase):
         Test that the real performer_aliases.json maps representative
         aliases to canonical names.
         """
-        alias_path = os.path.abspath(
-            os.path.join(
-                os.path.dirname(__file__),
-                '../src/performer_aliases.json'
-            )
-        )
-        with open(alias_path, 'r', encoding='utf-8') as f:
-            alias_map = json.load(f)
-        # Pick a few canonical performers and representative aliases to test
-        test_cases = [
-            ("rza", ["rza", "bobby digital", "the abbot"]),
-            ("gza", ["gza", "the genius"]),
-            ("method man", ["method man", "meth", "johnny blaze"]),
-            ("ghostface killah", ["ghostface killah", "ghostface",
-                                  "tony starks"]),
-            ("inspectah deck", ["inspectah deck", "deck"]),
-            ("ol' dirty bastard", ["ol' dirty bastard", "odb",
-                                   "dirt mcgirt"]),
-            ("masta killa", ["masta killa", "noodles"]),
-            ("u-god", ["u-god", "golden arms"]),
-            ("cappadonna", ["cappadonna", "cappa"]),
-        ]
-        for canonical, aliases in test_cases:
+        alias_map = self.alias_map
+        for canonical, aliases in REAL_ALIAS_CASES:
             for alias in aliases:
-                result = match_key_to_canonical(alias, alias_map)
-                self.assertEqual(result,
-                                 canonical,
-                                 f"Alias '{alias}' should map to '{canonical}'"
-                                 )
+                with self.subTest(alias=alias, canonical=canonical):
+                    self.assertEqual(
+                        match_key_to_canonical(alias, alias_map), canonical
+                    )
     """
     Tests for loading performer alias mappings and matching keys to canonical
     performer names.
@@ -211,15 +329,14 @@ class TestIdentifyPerformerKeys(unittest.TestCase):
             "gza": ["gza", "the genius"],
             "method man": ["method man", "meth", "johnny blaze"]
         }
-        tmpdir = tempfile.mkdtemp()
-        alias_path = os.path.join(tmpdir, "aliases.json")
-        with open(alias_path, 'w', encoding='utf-8') as f:
-            json.dump(alias_map, f)
-        # Load and check
-        with open(alias_path, 'r', encoding='utf-8') as f:
-            loaded = json.load(f)
+        with tempdir() as tmpdir:
+            alias_path = os.path.join(tmpdir, "aliases.json")
+            with open(alias_path, 'w', encoding='utf-8') as f:
+                json.dump(alias_map, f)
+            # Load and check
+            with open(alias_path, 'r', encoding='utf-8') as f:
+                loaded = json.load(f)
         self.assertEqual(loaded, alias_map)
-        shutil.rmtree(tmpdir)
 
     def test_match_key_to_alias(self):
         """Test matching key candidates to performer aliases."""
@@ -255,6 +372,142 @@ class TestIdentifyPerformerKeys(unittest.TestCase):
             match_key_to_canonical("ghostface", alias_map)
         )
 
+    def test_build_alias_index(self):
+        """
+        Test that the alias index maps normalized aliases to canonical names
+          and gives the same lookups as the plain alias map.
+        """
+        alias_map = {
+            "rza": ["rza", "Bobby Digital"],
+            "u-god": ["u-god", "golden arms"],
+            "gza": ["gza", "rza"]
+        }
+        index = build_alias_index(alias_map)
+        self.assertEqual(index["bobby digital"], "rza")
+        self.assertEqual(index["u god"], "u-god")
+        # First canonical wins for an alias listed twice
+        self.assertEqual(index["rza"], "rza")
+        for key in ("BOBBY DIGITAL", "u-god", "gza", "ghostface"):
+            self.assertEqual(
+                match_key_to_canonical(key, alias_map, alias_index=index),
+                match_key_to_canonical(key, alias_map)
+            )
+
+    def test_match_without_index_sees_alias_map_edits(self):
+        """
+        Test that lookups without a prebuilt index reflect any edit to the
+          same alias map between calls, including edits that keep the
+          number of canonicals and aliases unchanged.
+        """
+        alias_map = {"rza": ["rza"], "gza": ["gza"]}
+        self.assertIsNone(match_key_to_canonical("genius", alias_map))
+        alias_map["gza"].append("genius")
+        self.assertEqual(match_key_to_canonical("genius", alias_map), "gza")
+        alias_map["method man"] = ["meth"]
+        self.assertEqual(classify_key("meth", alias_map), "performer")
+        # Rename an alias in place
+        alias_map["gza"][0] = "the genius"
+        self.assertIsNone(match_key_to_canonical("gza", alias_map))
+        self.assertEqual(match_key_to_canonical("the genius", alias_map),
+                         "gza")
+        # Move an alias to another canonical
+        alias_map["gza"].remove("genius")
+        alias_map["rza"].append("genius")
+        self.assertEqual(match_key_to_canonical("genius", alias_map), "rza")
+        self.assertEqual(find_canonical_performers("genius", alias_map),
+                         {"rza"})
+
+    def test_find_canonical_performers_whole_words(self):
+        """
+        Test that single- and multi-word aliases only match whole words
+          within a key, whether or not the key is already normalized.
+        """
+        alias_map = {
+            "rza": ["rza", "bobby digital"],
+            "method man": ["method man", "meth"],
+            "inspectah deck": ["inspectah deck", "rebel ins"]
+        }
+        self.assertEqual(
+            find_canonical_performers("chorus bobby digital meth", alias_map),
+            {"rza", "method man"}
+        )
+        self.assertEqual(
+            find_canonical_performers("bobby methods", alias_map), set()
+        )
+        # Un-normalized keys: mixed case, '&' / ':' / ',' separators
+        cases = [
+            ("Method Man & Redman", {"method man"}),
+            ("Bobby Digital: Method Man", {"rza", "method man"}),
+            ("rza, meth and inspectah deck",
+             {"rza", "method man", "inspectah deck"}),
+            ("Rebel INS, Bobby  Digital", {"inspectah deck", "rza"}),
+        ]
+        for key, expected in cases:
+            with self.subTest(key=key):
+                self.assertEqual(find_canonical_performers(key, alias_map),
+                                 expected)
+
+    def test_long_key_probes_only_alias_length_phrases(self):
+        """
+        Test that a very long key is only probed with phrases up to the
+          longest alias length, and still finds aliases anywhere in it.
+        """
+        alias_map = {
+            "rza": ["rza", "bobby digital"],
+            "inspectah deck": ["inspectah deck", "rollie fingers deck"]
+        }
+        self.assertEqual(
+            alias_phrase_length(build_alias_index(alias_map)), 3
+        )
+        self.assertEqual(alias_phrase_length({}), 0)
+
+        class CountingIndex(dict):
+            """Alias index that counts its membership probes."""
+            probes = 0
+
+            def __contains__(self, phrase):
+                self.probes += 1
+                return super().__contains__(phrase)
+
+        # Only the last three words name a performer
+        words = ["word"] * 2000 + ["rollie", "fingers", "deck"]
+        key = " ".join(words)
+        alias_index = CountingIndex(build_alias_index(alias_map))
+        self.assertEqual(
+            classify_key(key, alias_map, alias_index=alias_index),
+            "performer"
+        )
+        self.assertLessEqual(alias_index.probes, 3 * len(words))
+        self.assertEqual(
+            find_canonical_performers("Bobby Digital " + key, alias_map,
+                                      alias_index),
+            {"rza", "inspectah deck"}
+        )
+        self.assertEqual(
+            classify_key(" ".join(["word"] * 2000), alias_map), "skip"
+        )
+
+    def test_find_canonical_performers_normalizes_parts(self):
+        """
+        Test that each part of an un-normalized key is normalized before
+          lookup (case, ':' / ',' separators).
+        """
+        alias_map = {
+            "rza": ["rza", "bobby digital"],
+            "raekwon": ["raekwon", "chef"],
+            "ghostface killah": ["ghostface killah", "ghostface"]
+        }
+        cases = [
+            ("RZA", {"rza"}),
+            ("rza:", {"rza"}),
+            ("shout outs from raekwon, ghostface and rza",
+             {"raekwon", "ghostface killah", "rza"}),
+        ]
+        for key, expected in cases:
+            with self.subTest(key=key):
+                self.assertEqual(find_canonical_performers(key, alias_map),
+                                 expected)
+
 
 # 4. Classify Keys
 class TestClassifyKeys(unittest.TestCase):
@@ -265,94 +518,68 @@ class TestClassifyKeys(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        alias_path = os.path.abspath(
-            os.path.join(
-                os.path.dirname(__file__),
-                '../src/performer_aliases.json'
-            )
-        )
-        with open(alias_path, 'r', encoding='utf-8') as f:
-            cls.alias_map = json.load(f)
+        cls.alias_map = load_json_fixture(ALIAS_PATH)
+        cls.alias_index = build_alias_index(cls.alias_map)
         # Use IGNORE_SET from src.split_lyrics_by_performer
         cls.ignore_set = IGNORE_SET
-        # Load labeled keys
-        labeled_path = os.path.abspath(
-            os.path.join(
-                os.path.dirname(__file__),
-                '../tests/unique_keys_labeled.json'
-            )
+        # Load labeled keys as (key, type) pairs, dropping 'unknown' labels
+        cls.labeled_cases = tuple(
+            (entry["key"], entry["type"])
+            for entry in load_json_fixture(LABELED_PATH)
+            if entry.get("type") != "unknown" and entry.get("key") is not None
         )
-        with open(labeled_path, 'r', encoding='utf-8') as f:
-            cls.labeled_keys = json.load(f)
+
+    def test_ignore_set_is_normalized(self):
+        """
+        Test that IGNORE_SET is immutable and every entry is already in
+          normalize_key_string form, so normalized keys can match it.
+        """
+        self.assertIsInstance(IGNORE_SET, frozenset)
+        for label in IGNORE_SET:
+            self.assertEqual(normalize_key_string(label), label)
 
     def test_static_classification(self):
         """Test static examples for each class."""
-        self.assertEqual(
-            classify_key("rza", self.alias_map, self.ignore_set),
-            "performer"
-        )
-        self.assertEqual(
-            classify_key("chorus rza", self.alias_map, self.ignore_set),
-            "performer"
-        )
-        self.assertEqual(
-            classify_key("chorus", self.alias_map, self.ignore_set),
-            "ignore"
-        )
-        self.assertEqual(
-            classify_key("all", self.alias_map, self.ignore_set),
-            "skip"
-        )
-        self.assertEqual(
-            classify_key("sample", self.alias_map, self.ignore_set),
-            "skip"
-        )
-        self.assertEqual(
-            classify_key("chorus 2x", self.alias_map, self.ignore_set),
-            "ignore"
-        )
-        self.assertEqual(
-            classify_key("ghostface killah", self.alias_map, self.ignore_set),
-            "performer"
-        )
-        self.assertEqual(
-            classify_key("chorus ghostface killah",
-                         self.alias_map, self.ignore_set),
-            "performer"
-        )
-        self.assertEqual(
-            classify_key("random label", self.alias_map, self.ignore_set),
-            "skip"
-        )
+        cases = [
+            ("rza", "performer"),
+            ("chorus rza", "performer"),
+            ("chorus", "ignore"),
+            ("all", "skip"),
+            ("sample", "skip"),
+            ("chorus 2x", "ignore"),
+            ("ghostface killah", "performer"),
+            ("chorus ghostface killah", "performer"),
+            ("random label", "skip"),
+        ]
+        for key, expected in cases:
+            with self.subTest(key=key):
+                self.assertEqual(
+                    classify_key(key, self.alias_map, self.ignore_set),
+                    expected
+                )
 
     def test_labeled_file_classification(self):
         """
         Test that all keys in unique_keys_labeled.json are classified as
           expected (ignoring 'unknown').
         """
-        mismatches = []
-        for entry in self.labeled_keys:
-            key = entry.get("key")
-            expected = entry.get("type")
-            if expected == "unknown" or key is None:
-                continue
-            actual = classify_key(key, self.alias_map, self.ignore_set)
-            if actual != expected:
-                mismatches.append((key, expected, actual))
-        if mismatches:
-            print("\nMismatches between labeled file and classifier:")
-            for key, expected, actual in mismatches:
-                print(
-                    f"  key: {key!r:30} "
-                    f"expected: {expected!r:10} "
-                    f"actual: {actual!r}"
+        # Bind the fixtures locally for the per-key loop
+        alias_map, ignore_set = self.alias_map, self.ignore_set
+        alias_index = self.alias_index
+        for key, expected in self.labeled_cases:
+            with self.subTest(key=key):
+                self.assertEqual(
+                    classify_key(key, alias_map, ignore_set,
+                                 alias_index=alias_index),
+                    expected
                 )
-            print(f"Total mismatches: {len(mismatches)}")
-        self.assertTrue(
-            len(mismatches) == 0,
-            f"{len(mismatches)} mismatches between labeled file and "
-            "classifier."
-        )
+
+
+# Two-performer alias map shared (read-only) by the ignore-section tests
+RZA_GZA_ALIAS_MAP = {
+    "rza": ["rza"],
+    "gza": ["gza"]
+}
 
 
 # 5. Ignore Sections After Ignore Keys
@@ -412,11 +639,14 @@ class TestIgnoreSectionsAfterIgnoreKeys(unittest.TestCase):
             performer_chunks["method man"],
             ["Meth verse 1", "Meth verse 2"]
         )
-        # Optionally, check that ignored sections are not present
-        for performer in performer_chunks:
-            for line in performer_chunks[performer]:
-                self.assertNotIn("Chorus", line)
-                self.assertNotIn("Skit", line)
+        # Check that ignored sections are not present
+        leaked = [
+            line
+            for chunk in performer_chunks.values()
+            for line in chunk
+            if "Chorus" in line or "Skit" in line
+        ]
+        self.assertEqual(leaked, [])
 
     def test_multi_performer_key_triggers_skip(self):
         """
@@ -431,12 +661,8 @@ class TestIgnoreSectionsAfterIgnoreKeys(unittest.TestCase):
             "[gza]",
             "GZA verse"
         ]
-        alias_map = {
-            "rza": ["rza"],
-            "gza": ["gza"]
-        }
         performer_chunks = split_lyrics_by_performer(
-            lines, alias_map, IGNORE_SET
+            lines, RZA_GZA_ALIAS_MAP, IGNORE_SET
         )
         self.assertEqual(
             performer_chunks["rza"], ["RZA verse"]
@@ -445,11 +671,8 @@ class TestIgnoreSectionsAfterIgnoreKeys(unittest.TestCase):
             performer_chunks["gza"], ["GZA verse"]
         )
         # "Collab verse" should not be attributed to anyone
-        for performer in performer_chunks:
-            self.assertNotIn(
-                             "Collab verse",
-                             performer_chunks[performer]
-                            )
+        self.assertFalse(any("Collab verse" in chunk
+                             for chunk in performer_chunks.values()))
 
     def test_multiple_ignore_keys(self):
         """
@@ -466,12 +689,8 @@ class TestIgnoreSectionsAfterIgnoreKeys(unittest.TestCase):
             "[gza]",
             "GZA verse"
         ]
-        alias_map = {
-            "rza": ["rza"],
-            "gza": ["gza"]
-        }
         performer_chunks = split_lyrics_by_performer(
-            lines, alias_map, IGNORE_SET
+            lines, RZA_GZA_ALIAS_MAP, IGNORE_SET
         )
         self.assertEqual(
             performer_chunks["rza"], ["RZA verse"]
@@ -480,57 +699,55 @@ class TestIgnoreSectionsAfterIgnoreKeys(unittest.TestCase):
             performer_chunks["gza"], ["GZA verse"]
         )
 
+    def test_skip_key_does_not_attribute(self):
+        """
+        Test that lines after a skip key are not attributed to any performer.
+        """
         lines = [
             "[rza]",
             "RZA verse",
-            "[chorus]",
-            "Chorus line",
-            "[skit]",
-            "Skit line",
+            "[all]",
+            "Group line",
             "[gza]",
             "GZA verse"
         ]
-        alias_map = {
-            "rza": ["rza"],
-            "gza": ["gza"]
-        }
         performer_chunks = split_lyrics_by_performer(
-            lines, alias_map, IGNORE_SET
+            lines, RZA_GZA_ALIAS_MAP, IGNORE_SET
         )
         self.assertEqual(performer_chunks["rza"], ["RZA verse"])
         self.assertEqual(performer_chunks["gza"], ["GZA verse"])
+        # "Group line" should not be attributed
+        self.assertFalse(any("Group line" in chunk
+                             for chunk in performer_chunks.values()))
 
-    def test_skip_key_does_not_attribute(self):
+    def test_performers_without_lines_are_omitted(self):
         """
-        Test that lines after a skip key are not attributed to any performer.
+        Test that only performers with attributed lines appear in the
+          result (no empty buckets for unseen or line-less performers).
         """
         lines = [
-            "[rza]",
-            "RZA verse",
-            "[all]",
-            "Group line",
             "[gza]",
-            "GZA verse"
+            "[rza]",
+            "RZA verse"
         ]
         alias_map = {
             "rza": ["rza"],
-            "gza": ["gza"]
+            "gza": ["gza"],
+            "method man": ["meth"]
         }
         performer_chunks = split_lyrics_by_performer(
             lines, alias_map, IGNORE_SET
         )
-        self.assertEqual(performer_chunks["rza"], ["RZA verse"])
-        self.assertEqual(performer_chunks["gza"], ["GZA verse"])
-        # "Group line" should not be attributed
-        for performer in performer_chunks:
-            self.assertNotIn("Group line", performer_chunks[performer])
+        self.assertIs(type(performer_chunks), dict)
+        self.assertEqual(performer_chunks, {"rza": ["RZA verse"]})
+        with self.assertRaises(KeyError):
+            performer_chunks["gza"]
 
 
 # 5. ShareGPT Prompt Completion Pairs
 class TestShareGPTPromptCompletionPairs(unittest.TestCase):
-    def setUp(self):
-        from src.split_lyrics_by_performer import split_lines_to_jsonl_pairs
-        self.split_lines_to_jsonl_pairs = split_lines_to_jsonl_pairs
+    # Bound once for the class instead of re-imported before every test
+    split_lines_to_jsonl_pairs = staticmethod(split_lines_to_jsonl_pairs)
 
     def test_sharegpt_basic_structure(self):
         lines = [
@@ -624,7 +841,8 @@ class TestOutputTextFilesForPerformers(unittest.TestCase):
     def test_output_files_for_all_performers(self):
         """
         Test that output files are created for all canonical performers
-        and contain correct lyrics.
+        with lyrics and contain correct lyrics; empty performers are
+        skipped.
         """
         performer_chunks = {
             "rza": ["RZA verse 1", "RZA verse 2"],
@@ -633,17 +851,36 @@ class TestOutputTextFilesForPerformers(unittest.TestCase):
         }
         with tempdir() as out_dir:
             write_performer_files(performer_chunks, out_dir)
+            # One directory listing instead of an exists() probe per file
+            written = set(os.listdir(out_dir))
             for performer, lines in performer_chunks.items():
-                out_path = os.path.join(
-                    out_dir,
-                    f"{performer.replace(' ', '_')}.txt"
-                )
-                self.assertTrue(os.path.exists(out_path),
-                                f"File for {performer} not found")
-                with open(out_path, "r", encoding="utf-8") as f:
-                    contents = f.read().splitlines()
+                filename = f"{performer.replace(' ', '_')}.txt"
+                if not lines:
+                    self.assertNotIn(filename, written,
+                                     f"Empty file for {performer} written")
+                    continue
+                self.assertIn(filename, written,
+                              f"File for {performer} not found")
+                contents = read_output_lines(os.path.join(out_dir, filename))
                 self.assertEqual(contents, lines)
 
+    def test_empty_performer_does_not_displace_same_safe_name(self):
+        """
+        Test that a later performer without lines does not stop an earlier
+          performer with the same safe file name from being written.
+        """
+        performer_chunks = {
+            "u-god": ["U-God verse"],
+            "u god": []
+        }
+        with tempdir() as out_dir:
+            write_performer_files(performer_chunks, out_dir)
+            self.assertEqual(os.listdir(out_dir), ["u_god.txt"])
+            self.assertEqual(
+                read_output_lines(os.path.join(out_dir, "u_god.txt")),
+                ["U-God verse"]
+            )
+
     def test_only_valid_performer_keys_used(self):
         """
         Test that only valid performer keys are used for output
@@ -667,14 +904,82 @@ class TestOutputTextFilesForPerformers(unittest.TestCase):
             self.assertTrue(expected_files.issubset(actual_files))
             self.assertNotIn("not_a_performer.txt", actual_files)
 
+    def test_streaming_writer_matches_buffered_writer(self):
+        """
+        Test that write_performer_files_streaming writes the same files as
+          splitting first and then calling write_performer_files.
+        """
+        alias_map = {
+            "rza": ["rza", "bobby digital"],
+            "gza": ["gza", "genius"],
+            "method man": ["method man", "meth"]
+        }
+        lines = [
+            "[RZA]",
+            "RZA line one",
+            "",
+            "RZA line two",
+            "[Chorus]",
+            "Chorus line",
+            "[GZA & RZA]",
+            "Shared line",
+            "[Bobby Digital]",
+            "RZA line three",
+        ]
+        with tempdir() as buffered_dir, tempdir() as streaming_dir:
+            write_performer_files(
+                split_lyrics_by_performer(lines, alias_map),
+                buffered_dir,
+                alias_map=alias_map
+            )
+            write_performer_files_streaming(iter(lines),
+                                            streaming_dir,
+                                            alias_map)
+            self.assertEqual(set(os.listdir(streaming_dir)),
+                             set(os.listdir(buffered_dir)))
+            self.assertNotIn("method_man.txt", os.listdir(streaming_dir))
+            for name in os.listdir(buffered_dir):
+                with open(os.path.join(buffered_dir, name),
+                          encoding="utf-8") as f:
+                    expected = f.read()
+                with open(os.path.join(streaming_dir, name),
+                          encoding="utf-8") as f:
+                    self.assertEqual(f.read(), expected, name)
+
+    def test_streaming_writer_shares_file_for_same_safe_name(self):
+        """
+        Test that performers whose names map to the same safe file name
+          append to one file instead of truncating each other's output.
+        """
+        alias_map = {
+            "u-god": ["u-god"],
+            "u god": ["golden arms"]
+        }
+        lines = [
+            "[U-God]",
+            "first line",
+            "[Golden Arms]",
+            "second line",
+            "[U-God]",
+            "third line",
+        ]
+        with tempdir() as out_dir:
+            write_performer_files_streaming(iter(lines), out_dir, alias_map)
+            self.assertEqual(os.listdir(out_dir), ["u_god.txt"])
+            self.assertEqual(
+                read_output_lines(os.path.join(out_dir, "u_god.txt")),
+                ["first line", "second line", "third line"]
+            )
+
 
 class TestJsonlPromptCompletionPairs(unittest.TestCase):
     """
     Tests for JSONL prompt/completion splitting logic based on verse breaks.
     """
-    def setUp(self):
-        # Example Inspectah Deck lyrics as in the user prompt
-        self.deck_lyrics = [
+    @classmethod
+    def setUpClass(cls):
+        # Example Inspectah Deck lyrics as in the user prompt (read-only)
+        cls.deck_lyrics = [
             "ladies and gentlemen, we'd like to welcome to you",
             "all the way from the slums of shaolin",
             "special uninvited guests",
@@ -687,6 +992,44 @@ class TestJsonlPromptCompletionPairs(unittest.TestCase):
             "brandish your weapon or get dropped to the canvas",
             "scandalous, made the metro panic"
         ]
+        # Expected chat-format objects, sharing one system message
+        system = {
+            "role": "system",
+            "content": (
+                "You are Wu-Tang Clan member inspectah deck. "
+                "When a user prompts you with one of your lyrics, "
+                "you deliver the next line."
+            ),
+        }
+        # (user, assistant) pairs; none crosses the blank line between verses
+        expected_pairs = (
+            ("ladies and gentlemen, we'd like to welcome to you",
+             "all the way from the slums of shaolin"),
+            ("all the way from the slums of shaolin",
+             "special uninvited guests"),
+            ("special uninvited guests",
+             "came in through the back door"),
+            ("came in through the back door",
+             "ladies and gentlemen, it's them!"),
+            ("dance with the mantis, note the slim chances",
+             "chant this, anthem swing like pete sampras"),
+            ("chant this, anthem swing like pete sampras",
+             "takin it straight to big man on campus"),
+            ("takin it straight to big man on campus",
+             "brandish your weapon or get dropped to the canvas"),
+            ("brandish your weapon or get dropped to the canvas",
+             "scandalous, made the metro panic"),
+        )
+        cls.deck_expected = [
+            {
+                "conversations": [
+                    system,
+                    {"role": "user", "content": user},
+                    {"role": "assistant", "content": assistant},
+                ]
+            }
+            for user, assistant in expected_pairs
+        ]
 
     def test_jsonl_pairs_respect_verse_breaks(self):
         """
@@ -695,178 +1038,29 @@ class TestJsonlPromptCompletionPairs(unittest.TestCase):
         """
         performer = "inspectah deck"
         pairs = split_lines_to_jsonl_pairs(self.deck_lyrics, performer)
+        self.assertEqual(pairs, self.deck_expected)
 
-        expected = [
-            {
-                "conversations": [
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are Wu-Tang Clan member inspectah deck. "
-                            "When a user prompts you with one of your lyrics, "
-                            "you deliver the next line."
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": (
-                            "ladies and gentlemen, we'd like to welcome to you"
-                        ),
-                    },
-                    {
-                        "role": "assistant",
-                        "content": "all the way from the slums of shaolin",
-                    },
-                ]
-            },
-            {
-                "conversations": [
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are Wu-Tang Clan member inspectah deck. "
-                            "When a user prompts you with one of your lyrics, "
-                            "you deliver the next line."
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": "all the way from the slums of shaolin",
-                    },
-                    {
-                        "role": "assistant",
-                        "content": "special uninvited guests",
-                    },
-                ]
-            },
-            {
-                "conversations": [
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are Wu-Tang Clan member inspectah deck. "
-                            "When a user prompts you with one of your lyrics, "
-                            "you deliver the next line."
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": "special uninvited guests",
-                    },
-                    {
-                        "role": "assistant",
-                        "content": "came in through the back door",
-                    },
-                ]
-            },
-            {
-                "conversations": [
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are Wu-Tang Clan member inspectah deck. "
-                            "When a user prompts you with one of your lyrics, "
-                            "you deliver the next line."
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": "came in through the back door"
-                    },
-                    {
-                        "role": "assistant",
-                        "content": "ladies and gentlemen, it's them!"
-                    },
-                ]
-            },
-            {
-                "conversations": [
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are Wu-Tang Clan member inspectah deck. "
-                            "When a user prompts you with one of your lyrics, "
-                            "you deliver the next line."
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": "dance with the mantis, note the slim "
-                        "chances"
-                    },
-                    {
-                        "role": "assistant",
-                        "content": "chant this, anthem swing like pete sampras"
-                    },
-                ]
-            },
-            {
-                "conversations": [
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are Wu-Tang Clan member inspectah deck. "
-                            "When a user prompts you with one of your lyrics, "
-                            "you deliver the next line."
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": "chant this, anthem swing like pete sampras"
-                    },
-                    {
-                        "role": "assistant",
-                        "content": "takin it straight to big man on campus"
-                    },
-                ]
-            },
-            {
-                "conversations": [
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are Wu-Tang Clan member inspectah deck. "
-                            "When a user prompts you with one of your lyrics, "
-                            "you deliver the next line."
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": "takin it straight to big man on campus"
-                    },
-                    {
-                        "role": "assistant",
-                        "content": (
-                            "brandish your weapon or get dropped to the canvas"
-                        ),
-                    },
-                ]
-            },
-            {
-                "conversations": [
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are Wu-Tang Clan member inspectah deck. "
-                            "When a user prompts you with one of your lyrics, "
-                            "you deliver the next line."
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": (
-                            "brandish your weapon or get dropped to the canvas"
-                        ),
-                    },
-                    {
-                        "role": "assistant",
-                        "content": "scandalous, made the metro panic",
-                    },
-                ]
-            },
-        ]
-
-        self.assertEqual(pairs, expected)
+    def test_iter_jsonl_pairs_is_lazy_equivalent(self):
+        """
+        Test that iter_jsonl_pairs yields the same objects as
+          split_lines_to_jsonl_pairs, for both formats.
+        """
+        performer = "inspectah deck"
+        for fmt in ("chatml", "sharegpt"):
+            pairs = iter_jsonl_pairs(iter(self.deck_lyrics),
+                                     performer,
+                                     format=fmt)
+            self.assertNotIsInstance(pairs, list)
+            self.assertEqual(
+                list(pairs),
+                split_lines_to_jsonl_pairs(self.deck_lyrics,
+                                           performer,
+                                           format=fmt)
+            )
+        self.assertEqual(
+            list(iter_jsonl_pairs(self.deck_lyrics, performer, "unknown")),
+            []
+        )
 
 
 # 7. Output for a Specific Performer
@@ -874,14 +1068,15 @@ class TestOutputForSpecificPerformer(unittest.TestCase):
     """
     Tests for outputting text files for a specific performer or alias.
     """
-    def setUp(self):
-        # Minimal alias map and performer_chunks for testing
-        self.alias_map = {
+    @classmethod
+    def setUpClass(cls):
+        # Minimal alias map and performer_chunks for testing (read-only)
+        cls.alias_map = {
             "rza": ["rza", "bobby digital"],
             "gza": ["gza", "the genius"],
             "method man": ["method man", "meth"]
         }
-        self.performer_chunks = {
+        cls.performer_chunks = {
             "rza": ["RZA verse 1", "RZA verse 2"],
             "gza": ["GZA verse 1"],
             "method man": []
@@ -895,8 +1090,7 @@ class TestOutputForSpecificPerformer(unittest.TestCase):
                                   alias_map=self.alias_map)
             out_path = os.path.join(out_dir, "rza.txt")
             self.assertTrue(os.path.exists(out_path))
-            with open(out_path, "r", encoding="utf-8") as f:
-                contents = f.read().splitlines()
+            contents = read_output_lines(out_path)
             self.assertEqual(contents, self.performer_chunks["rza"])
             self.assertEqual(set(os.listdir(out_dir)), {"rza.txt"})
 
@@ -914,8 +1108,7 @@ class TestOutputForSpecificPerformer(unittest.TestCase):
             )
             out_path = os.path.join(out_dir, "rza.txt")
             self.assertTrue(os.path.exists(out_path))
-            with open(out_path, "r", encoding="utf-8") as f:
-                contents = f.read().splitlines()
+            contents = read_output_lines(out_path)
             self.assertEqual(contents, self.performer_chunks["rza"])
 
     def test_unknown_performer_raises(self):
@@ -932,8 +1125,7 @@ class TestOutputForSpecificPerformer(unittest.TestCase):
 
     def test_empty_output(self):
         """
-        Test that a performer with no lyrics creates an empty file or as
-          per design.
+        Test that a performer with no lyrics gets no output file.
         """
         with tempdir() as out_dir:
             write_performer_files({"method man": []},
@@ -941,10 +1133,8 @@ class TestOutputForSpecificPerformer(unittest.TestCase):
                                   alias_map=self.alias_map
                                   )
             out_path = os.path.join(out_dir, "method_man.txt")
-            self.assertTrue(os.path.exists(out_path))
-            with open(out_path, "r", encoding="utf-8") as f:
-                contents = f.read().splitlines()
-            self.assertEqual(contents, [])
+            self.assertFalse(os.path.exists(out_path))
+            self.assertEqual(os.listdir(out_dir), [])
 
     def test_case_insensitivity(self):
         """Test that performer/alias lookup is case-insensitive."""
@@ -986,83 +1176,34 @@ class TestOutputForSpecificPerformer(unittest.TestCase):
 
 # 8. Refactor and Polish
 class TestRefactorAndPolish(unittest.TestCase):
-    def test_pep8_compliance_test_module(self):
-        """
-        Test that test_split_lyrics_by_performer.py is PEP-8 compliant
-          (pycodestyle).
-        """
-        file_path = os.path.abspath(
-            os.path.join(
-                os.path.dirname(__file__),
-                'test_split_lyrics_by_performer.py'
-            )
-        )
-        output = StringIO()
-        style = pycodestyle.StyleGuide(quiet=False, stdout=output)
-        result = style.check_files([file_path])
-        violations = output.getvalue()
-        if result.total_errors > 0:
-            print(
-                "\nPEP-8 violations in test_split_lyrics_by_performer.py:\n"
-                + violations
-            )
-        self.assertEqual(
-            result.total_errors, 0,
-            f"PEP-8 violations found: {result.total_errors}\n{violations}"
-        )
     """
     Meta-tests for code clarity, maintainability, and integration.
     """
-    def test_pep8_compliance(self):
-        """
-        Test that split_lyrics_by_performer.py is PEP-8 compliant
-          (pycodestyle).
-        """
-        file_path = os.path.abspath(
-            os.path.join(
-                os.path.dirname(__file__),
-                '../src/split_lyrics_by_performer.py'
-            )
-        )
-        # Capture output
-        output = StringIO()
-        style = pycodestyle.StyleGuide(quiet=False, stdout=output)
-        result = style.check_files([file_path])
-        violations = output.getvalue()
-        if result.total_errors > 0:
-            print(
-                "\nPEP-8 violations in split_lyrics_by_performer.py:\n"
-                + violations
-            )
-        self.assertEqual(
-            result.total_errors, 0,
-            f"PEP-8 violations found: {result.total_errors}\n{violations}"
-        )
-
+    @unittest.skipUnless(os.environ.get("RUN_META_TESTS"),
+                         "re-runs the whole module; set RUN_META_TESTS=1")
     def test_all_tests_pass(self):
         """
         Integration test: Run all other tests in this module and assert
          that they pass. This ensures the test suite is passing as a whole.
+         Skipped unless RUN_META_TESTS is set, since the runner already
+         reports the same aggregate result without running everything twice.
         """
         # Discover all tests in this module except this one
-        loader = unittest.TestLoader()
-        suite = loader.loadTestsFromModule(__import__(__name__))
+        suite = unittest.defaultTestLoader.loadTestsFromModule(THIS_MODULE)
 
-        # Flatten the suite to get all test cases
-        def flatten_suite(suite):
-            for item in suite:
+        # Flatten the suite iteratively, leaving out this test as we go
+        tests = []
+        pending = deque([suite])
+        while pending:
+            for item in pending.popleft():
                 if isinstance(item, unittest.TestSuite):
-                    yield from flatten_suite(item)
-                else:
-                    yield item
-        tests = [t for t in flatten_suite(suite)
-                 if getattr(t,
-                            '_testMethodName',
-                            None
-                            ) != 'test_all_tests_pass']
-        result = unittest.TestResult()
-        for test in tests:
-            test(result)
+                    pending.append(item)
+                elif getattr(item, '_testMethodName',
+                             None) != 'test_all_tests_pass':
+                    tests.append(item)
+        # Run them as one suite so setUpClass fixtures are set up as usual
+        runner = unittest.TextTestRunner(stream=StringIO(), verbosity=0)
+        result = runner.run(unittest.TestSuite(tests))
         # If there are any failures or errors, fail this test
         if result.failures or result.errors:
             msgs = []